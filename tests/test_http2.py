@@ -0,0 +1,88 @@
+import copy
+import pickle
+
+import pytest
+
+from ts1.http2 import HTTP2FrameSignature, process_nghttpd_log
+
+
+NGHTTPD_LOG = """\
+[id=1] [  0.002] recv SETTINGS frame <length=18, flags=0x00, stream_id=0>
+          (niv=3)
+          [SETTINGS_HEADER_TABLE_SIZE(0x01):65536]
+          [SETTINGS_INITIAL_WINDOW_SIZE(0x04):6291456]
+          [UNKNOWN(0x4a4a):0]
+[id=1] [  0.002] recv WINDOW_UPDATE frame <length=4, flags=0x00, stream_id=0>
+          (window_size_increment=15663105)
+[id=1] [  0.002] recv PRIORITY frame <length=5, flags=0x00, stream_id=3>
+          (dep_stream_id=0, weight=201, exclusive=0)
+[id=1] [  0.002] recv (stream_id=1) :method: GET
+[id=1] [  0.002] recv (stream_id=1) :authority: localhost
+[id=1] [  0.002] recv (stream_id=1) :scheme: https
+[id=1] [  0.002] recv (stream_id=1) :path: /
+[id=1] [  0.002] recv (stream_id=1) user-agent: curl
+[id=1] [  0.002] recv HEADERS frame <length=40, flags=0x25, stream_id=1>
+          ; END_STREAM | END_HEADERS | PRIORITY
+          (padlen=0, dep_stream_id=0, weight=256, exclusive=1)
+          ; Open new stream
+"""
+
+
+def test_copy_and_pickle():
+    sig = process_nghttpd_log(NGHTTPD_LOG)[0]["signature"]
+    frames = sig.frames + [
+        HTTP2FrameSignature.from_dict({"frame_type": "GOAWAY", "stream_id": 0})
+    ]
+    for frame in frames:
+        assert copy.copy(frame).to_dict() == frame.to_dict()
+    for obj in [sig] + frames:
+        # Fill the signature's caches first
+        obj.hash()
+        assert copy.deepcopy(obj).canonicalize() == obj.canonicalize()
+        assert pickle.loads(pickle.dumps(obj)).canonicalize() == \
+            obj.canonicalize()
+
+
+def test_multiple_clients():
+    settings = NGHTTPD_LOG[:NGHTTPD_LOG.index("[id=1] [  0.002] recv WINDOW")]
+    headers = NGHTTPD_LOG[NGHTTPD_LOG.index("[id=1] [  0.002] recv PRIORITY"):]
+    goaway = (
+        "[id=2] [  0.003] recv GOAWAY frame "
+        "<length=8, flags=0x00, stream_id=0>\n"
+        "          (last_stream_id=0, error_code=NO_ERROR(0x00))\n"
+    )
+    log = (settings + settings.replace("[id=1]", "[id=2]") + headers +
+           goaway + NGHTTPD_LOG.replace("[id=1]", "[id=3]"))
+
+    # By default parsing stops at the first HEADERS frame, and client 2 is
+    # returned with its incomplete signature
+    sigs = process_nghttpd_log(log)
+    assert [sig["client_id"] for sig in sigs] == [1, 2]
+    assert len(sigs[0]["signature"].frames) == 3
+    assert len(sigs[1]["signature"].frames) == 1
+
+    # Client 2 never sends HEADERS, so it is left out
+    complete = process_nghttpd_log(log, max_clients=2)
+    assert [sig["client_id"] for sig in complete] == [1, 3]
+    assert complete[1]["signature"].canonicalize() == \
+        process_nghttpd_log(NGHTTPD_LOG)[0]["signature"].canonicalize()
+
+    complete = process_nghttpd_log(log, max_clients=1)
+    assert [sig["client_id"] for sig in complete] == [1]
+
+
+def test_unknown_frame_type():
+    ping = (
+        "[id=2] [  0.001] recv PING frame "
+        "<length=8, flags=0x00, stream_id=0>\n"
+        "          (opaque_data=0000000000000000)\n"
+    )
+    log = ping + NGHTTPD_LOG + NGHTTPD_LOG.replace("[id=1]", "[id=2]")
+
+    with pytest.raises(Exception, match="Unknown frame type: PING"):
+        process_nghttpd_log(log)
+
+    sigs = process_nghttpd_log(log, max_clients=2)
+    assert [sig["client_id"] for sig in sigs] == [1, 2]
+    assert sigs[1]["signature"].canonicalize() == \
+        sigs[0]["signature"].canonicalize()
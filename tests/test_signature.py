@@ -0,0 +1,37 @@
+import copy
+import pickle
+
+import pytest
+
+from ts1.signature import Signature
+
+
+class ExampleSignature(Signature):
+    # Does not call Signature.__init__()
+    def __init__(self, data):
+        self.data = data
+
+    def to_dict(self):
+        return {"data": self.data, "raw": b"\x00\x01"}
+
+
+def test_canonicalize_and_hash():
+    sig = ExampleSignature([2, 1])
+    assert sig.canonicalize() == '{"data": [2, 1], "raw": "AAE="}'
+    h = sig.hash()
+    assert h.name == "sha1"
+    h.update(b"more")
+    assert sig.hash().hexdigest() != h.hexdigest()
+    assert sig.hash("blake2b").digest_size == 20
+    with pytest.raises(ValueError):
+        sig.hash("md5")
+
+
+def test_copy_and_pickle():
+    sig = ExampleSignature([2, 1])
+    sig.hash()
+    sig.short_key()
+    for other in [copy.deepcopy(sig), pickle.loads(pickle.dumps(sig))]:
+        assert other.canonicalize() == sig.canonicalize()
+        assert other.hash().digest() == sig.hash().digest()
+        assert other.short_key() == sig.short_key()
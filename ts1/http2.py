@@ -1,4 +1,5 @@
-from typing import List, Dict, Tuple
+import sys
+from typing import List, Dict, Tuple, Optional
 
 from ts1.signature import Signature
 from ts1.utils import NghttpdLogParser
@@ -9,37 +10,64 @@ class HTTP2FrameSignature(Signature):
     # A registry of subclasses
     registry = {}
 
+    # Registered subclasses define frame_type as a class attribute. Frames of
+    # other types are instances of _GenericFrame, which keeps it in a slot.
+    __slots__ = ("stream_id", )
+
+    def __new__(cls, *args, **kwargs):
+        if cls is HTTP2FrameSignature:
+            cls = _GenericFrame
+        return super().__new__(cls)
+
     def __init__(self, frame_type: str, stream_id: int):
-        self.frame_type = frame_type
-        self.stream_id = stream_id
+        # Frames without a stream ID are taken to refer to the connection
+        # itself, i.e. stream 0.
+        self.stream_id = stream_id if stream_id is not None else 0
 
-    def __init_subclass__(cls, /, frame_type: str, **kwargs):
+    def __init_subclass__(cls, /, frame_type: Optional[str] = None, **kwargs):
         """Register subclasses to the registry"""
         super().__init_subclass__(**kwargs)
+        if frame_type is None:
+            return
+        # Frame types and pseudo-headers recur in every signature. They are
+        # interned so that comparing the dict forms of signatures, as
+        # returned by to_dict(), can mostly compare string identities.
+        frame_type = sys.intern(frame_type)
         cls.registry[frame_type] = cls
         cls.frame_type = frame_type
 
     def to_dict(self):
-        d = {
-            "frame_type": self.frame_type
+        return {
+            "frame_type": self.frame_type,
+            "stream_id": self.stream_id
         }
-        if self.stream_id is not None:
-            d["stream_id"] = self.stream_id
-        return d
 
     @classmethod
     def from_dict(cls, d):
         """Unserialize an HTTP2FrameSignature from a dict.
 
         Initializes the suitable subclass if exists, otherwise initializes
-        an HTTP2FrameSignature proper instance.
+        a generic frame signature recording the frame type and stream ID.
         """
-        d = d.copy()
-        frame_type = d.pop("frame_type")
-        if frame_type in cls.registry:
-            return cls.registry[frame_type].from_dict(d)
+        frame_type = d["frame_type"]
+        subcls = cls.registry.get(frame_type)
+        if subcls is not None:
+            return subcls.from_dict(d)
         else:
-            return HTTP2FrameSignature(frame_type=frame_type)
+            return _GenericFrame(
+                frame_type=sys.intern(frame_type),
+                stream_id=d.get("stream_id")
+            )
+
+
+class _GenericFrame(HTTP2FrameSignature):
+    """Signature of a frame of a type without a registered subclass."""
+
+    __slots__ = ("frame_type", )
+
+    def __init__(self, frame_type: str, stream_id: int):
+        super().__init__(frame_type, stream_id)
+        self.frame_type = frame_type
 
 
 class HTTP2SettingsFrame(HTTP2FrameSignature, frame_type="SETTINGS"):
@@ -49,25 +77,25 @@ class HTTP2SettingsFrame(HTTP2FrameSignature, frame_type="SETTINGS"):
     HTTP2_GREASE = "GREASE"
 
     # See RFC7540, section "Defined SETTINGS parameters"
-    VALID_SETTINGS = [1, 2, 3, 4, 5, 6]
+    VALID_SETTINGS = frozenset([1, 2, 3, 4, 5, 6])
+
+    __slots__ = ("settings", )
 
     def __init__(self, stream_id: int, settings: List[Tuple]):
         super().__init__(self.frame_type, stream_id)
-        self.settings = []
-        for (k, v) in settings:
-            if k not in self.VALID_SETTINGS:
-                k = self.HTTP2_GREASE
-            if k == self.HTTP2_GREASE:
-                v = self.HTTP2_GREASE
-            self.settings.append({
-                "id": k,
-                "value": v
-            })
+        grease = self.HTTP2_GREASE
+        self.settings = [
+            {"id": k, "value": v} if k in self.VALID_SETTINGS
+            else {"id": grease, "value": grease}
+            for (k, v) in settings
+        ]
 
     def to_dict(self):
-        d = super().to_dict()
-        d["settings"] = self.settings
-        return d
+        return {
+            "frame_type": self.frame_type,
+            "stream_id": self.stream_id,
+            "settings": self.settings
+        }
 
     @classmethod
     def from_dict(cls, d: dict):
@@ -78,14 +106,18 @@ class HTTP2SettingsFrame(HTTP2FrameSignature, frame_type="SETTINGS"):
 
 
 class HTTP2WindowUpdateFrame(HTTP2FrameSignature, frame_type="WINDOW_UPDATE"):
+    __slots__ = ("window_size_increment", )
+
     def __init__(self, stream_id: int, window_size_increment: int):
         super().__init__(self.frame_type, stream_id)
         self.window_size_increment = window_size_increment
 
     def to_dict(self):
-        d = super().to_dict()
-        d["window_size_increment"] = self.window_size_increment
-        return d
+        return {
+            "frame_type": self.frame_type,
+            "stream_id": self.stream_id,
+            "window_size_increment": self.window_size_increment
+        }
 
     @classmethod
     def from_dict(cls, d: dict):
@@ -96,14 +128,18 @@ class HTTP2WindowUpdateFrame(HTTP2FrameSignature, frame_type="WINDOW_UPDATE"):
 
 
 class HTTP2HeadersFrame(HTTP2FrameSignature, frame_type="HEADERS"):
+    __slots__ = ("pseudo_headers", )
+
     def __init__(self, stream_id: int, pseudo_headers: List[str]):
         super().__init__(self.frame_type, stream_id)
-        self.pseudo_headers = pseudo_headers
+        self.pseudo_headers = [sys.intern(h) for h in pseudo_headers]
 
     def to_dict(self):
-        d = super().to_dict()
-        d["pseudo_headers"] = self.pseudo_headers
-        return d
+        return {
+            "frame_type": self.frame_type,
+            "stream_id": self.stream_id,
+            "pseudo_headers": self.pseudo_headers
+        }
 
     @classmethod
     def from_dict(cls, d: dict):
@@ -114,6 +150,8 @@ class HTTP2HeadersFrame(HTTP2FrameSignature, frame_type="HEADERS"):
 
 
 class HTTP2PriorityFrame(HTTP2FrameSignature, frame_type="PRIORITY"):
+    __slots__ = ("priority", )
+
     def __init__(self,
                  stream_id: int,
                  dep_stream_id: int,
@@ -127,9 +165,11 @@ class HTTP2PriorityFrame(HTTP2FrameSignature, frame_type="PRIORITY"):
         }
 
     def to_dict(self):
-        d = super().to_dict()
-        d["priority"] = self.priority
-        return d
+        return {
+            "frame_type": self.frame_type,
+            "stream_id": self.stream_id,
+            "priority": self.priority
+        }
 
     @classmethod
     def from_dict(cls, d: dict):
@@ -154,6 +194,8 @@ class HTTP2Signature(Signature):
     only parameters.
     """
 
+    __slots__ = ("frames", )
+
     def __init__(self, frames: List[HTTP2FrameSignature]):
         """
         Initialize a new HTTP2Signature.
@@ -197,13 +239,22 @@ class HTTP2Signature(Signature):
         )
 
 
-def process_nghttpd_log(log: str) -> List[Dict]:
+def process_nghttpd_log(
+    log: str,
+    max_clients: Optional[int] = None
+) -> List[Dict]:
     """Parse nghttpd's log to extract HTTP/2 client signatures.
 
     Parameters
     ----------
     log : str
         nghttpd's output when given the '-v' flag.
+    max_clients : int, optional
+        Number of clients to read complete signatures of. Only clients with a
+        complete signature are returned then. By default, reading stops after
+        the first HEADERS frame in the log, and clients whose signature is
+        incomplete at that point are returned as well.
+        See NghttpdLogParser.parse().
 
     Returns
     -------
@@ -213,10 +264,11 @@ def process_nghttpd_log(log: str) -> List[Dict]:
         and "signature", a HTTP2Signature object containing the client's
         signature.
     """
+    parsed = NghttpdLogParser(log).parse(max_clients)
     return [
         {
             "client_id": client_id,
             "signature": HTTP2Signature.from_dict({"frames": frames})
         }
-        for client_id, frames in NghttpdLogParser(log).parse().items()
+        for client_id, frames in parsed.items()
     ]
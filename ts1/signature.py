@@ -2,6 +2,23 @@ import json
 import base64
 import hashlib
 
+# The hash is used as an identifier only. Python 3.9+ lets us say so, which
+# keeps it available on FIPS-restricted OpenSSL builds.
+try:
+    hashlib.sha1(usedforsecurity=False)
+    _HASH_KWARGS = {"usedforsecurity": False}
+except TypeError:
+    _HASH_KWARGS = {}
+
+# Hash algorithms supported by Signature.hash(). Both produce a 20-byte
+# digest. BLAKE2b is faster in software, especially where the CPU has no
+# SHA instructions, but SHA1 remains the default for compatibility with
+# existing hashes.
+_HASH_FUNCTIONS = {
+    "sha1": lambda data: hashlib.sha1(data, **_HASH_KWARGS),
+    "blake2b": lambda data: hashlib.blake2b(data, digest_size=20),
+}
+
 
 class BytesJSONEncoder(json.JSONEncoder):
     """
@@ -16,11 +33,28 @@ class BytesJSONEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, o)
 
 
+# Encoder used by Signature.to_json() when no arguments are given
+_DEFAULT_ENCODER = BytesJSONEncoder()
+
+# Encoder producing the canonical form, see Signature.canonicalize()
+_CANON_ENCODER = BytesJSONEncoder(
+    sort_keys=True,
+    indent=None,
+    separators=(", ", ": ")
+)
+
+
 class Signature:
     """
     Abstract class that represents a network client's signature.
+
+    Signatures are not expected to change after they are initialized. The
+    canonical form is computed once and cached on the instance. Subclasses
+    need not initialize the cache.
     """
 
+    __slots__ = ("_canon", "_digests")
+
     def to_dict(self):
         raise NotImplementedError()
 
@@ -32,7 +66,9 @@ class Signature:
         kwargs : dict
             Additional arguments to json.dumps()
         """
-        return BytesJSONEncoder(**kwargs).encode(self.to_dict())
+        if kwargs:
+            return BytesJSONEncoder(**kwargs).encode(self.to_dict())
+        return _DEFAULT_ENCODER.encode(self.to_dict())
 
     def canonicalize(self):
         """Return the canonical form of this signature.
@@ -44,22 +80,68 @@ class Signature:
         The canonical form is the JSON encoding of the dict
         form, with keys ordered alphabetically, byte objects encoded with bas64
         and a single space after separators.
+
+        The canonical form is computed on the first call and cached. Changes
+        made to the signature afterwards, e.g. to its lists of frames or
+        extensions, are not reflected in it.
         """
-        return BytesJSONEncoder(
-            sort_keys=True,
-            indent=None,
-            separators=(", ", ": ")
-        ).encode(self.to_dict())
+        canon = getattr(self, "_canon", None)
+        if canon is None:
+            canon = self._canon = _CANON_ENCODER.encode(self.to_dict())
+        return canon
 
-    def hash(self):
+    def hash(self, algo: str = "sha1"):
         """Return a hash encoding all the information in the signature.
 
-        The hash is SHA1 of the signature's canonical form as created by
-        Signature.canonicalize()
+        The hash is computed over the signature's canonical form as created by
+        Signature.canonicalize(), using SHA1 by default. As the canonical form
+        is cached, changes made to the signature after its first use are not
+        reflected in the hash either.
+
+        Parameters
+        ----------
+        algo : str
+            Hash algorithm to use, either "sha1" (the default) or "blake2b".
+            The BLAKE2b digest is truncated to 20 bytes, the size of a SHA1
+            digest.
 
         Returns
         -------
         hash
             Hash object as returned from hashlib
         """
-        return hashlib.sha1(self.canonicalize().encode("utf-8"))
+        if algo not in _HASH_FUNCTIONS:
+            raise ValueError(f"Unknown hash algorithm: {algo}")
+        # The canonical form is pure ASCII as non-ASCII characters are
+        # escaped by the JSON encoder.
+        return _HASH_FUNCTIONS[algo](self.canonicalize().encode("ascii"))
+
+    def short_key(self, algo: str = "sha1") -> int:
+        """Return the first 8 bytes of the signature's hash as an integer.
+
+        Intended as a dict key when matching a signature against many known
+        ones, e.g. a dict mapping short keys to lists of signatures. Distinct
+        signatures may share a short key, so compare the full signatures (or
+        hashes) of the candidates found.
+
+        Parameters
+        ----------
+        algo : str
+            Hash algorithm to use, see Signature.hash().
+
+        Returns
+        -------
+        key : int
+            64-bit unsigned integer.
+        """
+        return int.from_bytes(self._digest(algo)[:8], "big")
+
+    def _digest(self, algo: str) -> bytes:
+        """Return the digest of Signature.hash(), cached by algorithm."""
+        digests = getattr(self, "_digests", None)
+        if digests is None:
+            digests = self._digests = {}
+        digest = digests.get(algo)
+        if digest is None:
+            digest = digests[algo] = self.hash(algo).digest()
+        return digest
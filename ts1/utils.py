@@ -1,6 +1,25 @@
 import re
-import collections
-from typing import List, Dict, Tuple
+import itertools
+from typing import List, Dict, Tuple, Optional
+
+
+# A frame received from the client would appear in the log as:
+# "[id=1] [  7.801] recv WINDOW_UPDATE frame <length=4, flags=0x00, stream_id=0>"
+# followed by indented lines describing the frame's parameters, e.g.
+# "          (window_size_increment=15663105)"
+# The whole block, header line and parameter lines, is matched at once.
+_FRAME_RE = re.compile(
+    r"^\[id=(?P<client_id>\d+)\].*recv (?P<frame_type>[A-Z_]+) frame"
+    r".*stream_id=(?P<stream_id>\d+).*\n?"
+    r"(?P<body>(?:[ \t]+.*\n?)*)",
+    re.M
+)
+_NIV_RE = re.compile(r"\s*\(niv=(\d+)\)")
+_SETTING_RE = re.compile(r"^\s*\[[A-Z_]+\(0x([0-9a-fA-F]+)\):(\d+)\]", re.M)
+_WINDOW_RE = re.compile(r"\s*\(window_size_increment=(\d+)\)")
+_PRIORITY_RE = re.compile(
+    r"\s*\(dep_stream_id=(\d+), weight=(\d+), exclusive=(\d+)\)"
+)
 
 
 class NghttpdLogParser:
@@ -15,25 +34,26 @@ class NghttpdLogParser:
         match = None
         while match is None:
             # Consume the next lines until the number of settings is found
-            match = re.match(r"\s*\(niv=(\d+)\)", next(lines))
+            match = _NIV_RE.match(next(lines))
         niv = int(match.group(1))
 
-        settings = []
-        for i in range(niv):
-            line = next(lines)
-            match = re.match(r"\s*\[[A-Z_]+\(0x(\d+)\):(\d+)\]", line)
-            if not match:
-                raise Exception(f"Malformed log: unexpected line '{line}'")
-
-            key = int(match.group(1), 16)
-            value = int(match.group(2))
-            settings.append((key, value))
+        # Each of the next niv lines holds a single setting
+        block = "\n".join(itertools.islice(lines, niv))
+        settings = [
+            (int(key, 16), int(value))
+            for key, value in _SETTING_RE.findall(block)
+        ]
+        if len(settings) != niv:
+            raise Exception(
+                f"Malformed log: expected {niv} settings, "
+                f"found {len(settings)} in '{block}'"
+            )
 
         return settings
 
     def _process_window_update_frame(self, lines) -> int:
         line = next(lines)
-        match = re.match(r"\s*\(window_size_increment=(\d+)\)", line)
+        match = _WINDOW_RE.match(line)
         if not match:
             raise Exception(f"Malformed log: unexpected line '{line}'")
 
@@ -41,25 +61,25 @@ class NghttpdLogParser:
 
     def _process_headers_frame(
         self,
-        previous_lines: List[str],
+        start: int,
+        end: int,
+        client_id: int,
         stream_id: int
     ) -> List[str]:
-        pseudo_headers = []
-        for line in previous_lines:
-            match = re.match(
-                r".*recv \(stream_id={}\) (:[a-z]*?):".format(stream_id),
-                line
-            )
-            if match:
-                pseudo_headers.append(match.group(1))
-        return pseudo_headers
+        # Scan the log between the given offsets without slicing it
+        hdr_re = re.compile(
+            r"^\[id={}\].*recv \(stream_id={}\) (:[a-z]*?):".format(
+                client_id, stream_id
+            ),
+            re.M
+        )
+        return [
+            match.group(1) for match in hdr_re.finditer(self.log, start, end)
+        ]
 
     def _process_priority_frame(self, lines) -> Dict:
         line = next(lines)
-        match = re.match(
-            r"\s*\(dep_stream_id=(\d+), weight=(\d+), exclusive=(\d+)\)",
-            line
-        )
+        match = _PRIORITY_RE.match(line)
         if not match:
             raise Exception(f"Malformed log: unexpected line '{line}'")
         return {
@@ -68,34 +88,43 @@ class NghttpdLogParser:
             "exclusive": bool(int(match.group(3)))
         }
 
-    def parse(self) -> Dict[int, List[Dict]]:
+    def parse(
+        self,
+        max_clients: Optional[int] = None
+    ) -> Dict[int, List[Dict]]:
         """Parse the nghttpd log.
 
         Returns a dictionary containing the HTTP/2 frames found in the log.
         The keys are client IDs as reported by nghttpd. Each value is a list
-        of frames each parsed into a dictionary format.
+        of frames each parsed into a dictionary format. The frames of each
+        client end with its first HEADERS frame, unless parsing stopped before
+        it was seen.
+
+        Parameters
+        ----------
+        max_clients : int, optional
+            By default, parsing stops after the first HEADERS frame in the
+            log. If given, parsing instead continues until that many clients
+            have sent their first HEADERS frame, or the log ends. In that
+            case only these clients are returned, and frame types which are
+            not part of the signature are skipped rather than raising an
+            exception.
         """
-        frames = collections.defaultdict(list)
-        lines = iter(self.log.splitlines())
-        previous_lines = []
+        frames = {}
+        # The log lines of the HEADERS frame come before the "recv HEADERS"
+        # log line. Therefore we have to keep track of where each client's
+        # previously received frame ended.
+        previous_end = {}
+        # Clients which already sent their first HEADERS frame
+        done = set()
         try:
-            for line in lines:
-                # A frame received from the client would appear in the log as:
-                # "[id=1] [  7.801] recv WINDOW_UPDATE frame <length=4, flags=0x00, stream_id=0>"
-                match = re.match(
-                    r"\[id=(\d+)\].*recv ([A-Z_]+) frame.*stream_id=(\d+)",
-                    line
-                )
-                if not match:
-                    # The log lines of the HEADERS frame come before the
-                    # "recv HEADERS" log line. Therefore we have to keep
-                    # track of previously received lines.
-                    previous_lines.append(line)
+            for match in _FRAME_RE.finditer(self.log):
+                client_id = int(match.group("client_id"))
+                if client_id in done:
                     continue
-
-                client_id = int(match.group(1))
-                frame_type = match.group(2)
-                stream_id = int(match.group(3))
+                frame_type = match.group("frame_type")
+                stream_id = int(match.group("stream_id"))
+                lines = iter(match.group("body").splitlines())
 
                 frame = {
                     "frame_type": frame_type,
@@ -107,21 +136,42 @@ class NghttpdLogParser:
                     frame["window_size_increment"] = \
                         self._process_window_update_frame(lines)
                 elif frame_type == "HEADERS":
-                    frame["pseudo_headers"] = \
-                        self._process_headers_frame(previous_lines, stream_id)
+                    frame["pseudo_headers"] = self._process_headers_frame(
+                        previous_end.get(client_id, 0),
+                        match.start(),
+                        client_id,
+                        stream_id
+                    )
                 elif frame_type == "PRIORITY":
                     frame["priority"] = self._process_priority_frame(lines)
+                elif max_clients is not None:
+                    # Reading many clients' frames, we are likely to come
+                    # across e.g. PING or GOAWAY frames
+                    continue
                 else:
                     raise Exception(f"Unknown frame type: {frame_type}")
 
-                frames[client_id].append(frame)
+                client_frames = frames.get(client_id)
+                if client_frames is None:
+                    frames[client_id] = client_frames = []
+                client_frames.append(frame)
 
-                previous_lines = []
+                previous_end[client_id] = match.end()
 
-                # Stop after the first HEADERS frame
+                # Stop after the first HEADERS frame of each client
                 if frame_type == "HEADERS":
-                    break
+                    done.add(client_id)
+                    if max_clients is None or len(done) >= max_clients:
+                        break
         except StopIteration:
             raise Exception("Malformed log: log ended unexpectedly")
 
+        if max_clients is not None:
+            # Drop the clients whose signature is incomplete
+            frames = {
+                client_id: client_frames
+                for client_id, client_frames in frames.items()
+                if client_id in done
+            }
+
         return frames